@@ -20,16 +20,40 @@ Notes:
   collapsing whitespace and lowercasing.
 - A flavor line is removed if any normalized artist string is found as a
   substring of the normalized flavor line.
+- If pyahocorasick is installed (pip install pyahocorasick), all artists are
+  matched in a single pass per flavor line; otherwise only the artists whose
+  first characters occur in the flavor line are tested.
 """
 from __future__ import annotations
 import argparse
+import os
+import string
 import unicodedata
-import re
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import Pool
 from pathlib import Path
 from datetime import datetime
-from typing import List, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
-RE_NON_ALNUM = re.compile(r'[^0-9a-zA-Z\s]+')
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+_ALNUM_ORDS = frozenset(map(ord, string.ascii_letters + string.digits))
+
+
+class _NonAlnumTable(dict):
+    """str.translate table mapping every character except ASCII alphanumerics
+    and whitespace to a space; entries are filled in lazily and cached."""
+
+    def __missing__(self, o: int):
+        v = o if o in _ALNUM_ORDS or chr(o).isspace() else ' '
+        self[o] = v
+        return v
+
+
+NON_ALNUM_TO_SPACE = _NonAlnumTable()
 
 
 def normalize_text(s: str) -> str:
@@ -43,26 +67,26 @@ def normalize_text(s: str) -> str:
     """
     if s is None:
         return ""
-    # Unicode normalize
-    s = unicodedata.normalize("NFKD", s)
-    # Remove diacritical marks (combining marks)
-    s = ''.join(ch for ch in s if not unicodedata.category(ch).startswith('M'))
+    # Pure ASCII has nothing to decompose and no diacritics to strip
+    if not s.isascii():
+        # Unicode normalize
+        s = unicodedata.normalize("NFKD", s)
+        # Remove diacritical marks (combining marks)
+        category = unicodedata.category
+        s = ''.join(ch for ch in s if category(ch)[0] != 'M')
     # Remove non-alphanumeric characters (keeps spaces)
-    s = RE_NON_ALNUM.sub(' ', s)
+    s = s.translate(NON_ALNUM_TO_SPACE)
     # Collapse whitespace and lowercase
-    s = re.sub(r'\s+', ' ', s).strip().casefold()
-    return s
+    return ' '.join(s.split()).casefold()
 
 
 def load_nonempty_lines(path: Path) -> List[str]:
-    text = path.read_text(encoding='utf-8', errors='replace')
-    # Keep original lines trimmed of trailing newline only; preserve blank lines maybe skip them
-    lines = [line.rstrip('\n') for line in text.splitlines()]
-    return lines
+    # splitlines() already drops the line terminators; blank lines are kept
+    return path.read_text(encoding='utf-8', errors='replace').splitlines()
 
 
-def find_removals(flavors_lines: List[str], artists_lines: List[str]) -> Tuple[List[int], List[str]]:
-    """Return indexes of flavors_lines to remove and their original contents."""
+def normalize_artists(artists_lines: List[str]) -> List[str]:
+    """Return the normalized artist strings used as match patterns."""
     # Precompute normalized artist strings (skip empties)
     normalized_artists = []
     for a in artists_lines:
@@ -70,43 +94,122 @@ def find_removals(flavors_lines: List[str], artists_lines: List[str]) -> Tuple[L
         if not a_stripped:
             continue
         na = normalize_text(a_stripped)
-        if na:
-            normalized_artists.append(na)
+        # skip absurdly short artist tokens to avoid many false positives
+        if len(na.replace(' ', '')) <= 3:
+            continue
+        normalized_artists.append(na)
+    # Case/punctuation variants often normalize to the same string
+    normalized_artists = list(dict.fromkeys(normalized_artists))
+    # Longest (most specific) artists first, so the fallback matcher tries them first
+    normalized_artists.sort(key=len, reverse=True)
+    return normalized_artists
 
-    removals_idx = []
-    removals_lines = []
 
-    for idx, flavor in enumerate(flavors_lines):
-        flavor_stripped = flavor.strip()
-        if not flavor_stripped:
-            # skip empty lines (do not remove by artist match)
-            continue
-        nf = normalize_text(flavor_stripped)
-        matched = False
+def normalize_flavors(flavors_lines: List[str]) -> List[str]:
+    """Return the normalized form of every flavor line ('' for blank lines)."""
+    return [normalize_text(f.strip()) if f.strip() else '' for f in flavors_lines]
+
+
+# Match state, set up once per process by _init_matcher
+_artists: List[str] = []
+_automaton = None
+_prefix_index: Dict[str, List[int]] = {}
+_verbose = False
+
+# Every artist is at least this long after normalization (see normalize_artists)
+PREFIX_LEN = 4
+
+
+def _init_matcher(normalized_artists: List[str], verbose: bool = False) -> None:
+    global _artists, _automaton, _prefix_index, _verbose
+    _artists = normalized_artists
+    _verbose = verbose
+    _automaton = None
+    _prefix_index = {}
+    if ahocorasick is not None and normalized_artists:
+        # Build the pattern table once, then scan each flavor line a single time
+        _automaton = ahocorasick.Automaton()
         for na in normalized_artists:
-            # skip absurdly short artist tokens to avoid many false positives (optional)
-            # but we will still match short artists (e.g., 'Ai Weiwei') as provided.
-            if na and na in nf and len(na.replace(' ',''))>3 and 'and' in nf:
-                print(na, ' in ', nf)
-                matched = True
-                break
-        if matched:
-            removals_idx.append(idx)
-            removals_lines.append(flavor)
+            _automaton.add_word(na, na)
+        _automaton.make_automaton()
+    else:
+        # Index artists by their leading characters: an artist can only be a
+        # substring of a flavor line that contains its prefix somewhere
+        for i, na in enumerate(normalized_artists):
+            _prefix_index.setdefault(na[:PREFIX_LEN], []).append(i)
+
+
+def _match_chunk(chunk: Tuple[int, List[str]]) -> List[int]:
+    """Return indexes (offset by the chunk start) of matching normalized flavor lines."""
+    start, normalized_flavors = chunk
+    removals_idx = []
+    for idx, nf in enumerate(normalized_flavors, start):
+        # empty lines never match ('and' not in '')
+        if 'and' not in nf:
+            continue
+        if _automaton is not None:
+            na = next((na for _, na in _automaton.iter(nf)), None)
+        else:
+            candidates = {i for k in range(len(nf) - PREFIX_LEN + 1) for i in _prefix_index.get(nf[k:k + PREFIX_LEN], ())}
+            na = next((_artists[i] for i in sorted(candidates) if _artists[i] in nf), None)
+        if na is None:
+            continue
+        if _verbose:
+            print(na, ' in ', nf)
+        removals_idx.append(idx)
+    return removals_idx
+
+
+def find_removals(flavors_lines: List[str], artists_lines: List[str], jobs: int = 1, verbose: bool = False,
+                  normalized_flavors: Optional[List[str]] = None) -> Tuple[List[int], List[str]]:
+    """Return indexes of flavors_lines to remove and their original contents.
+    normalized_flavors can be passed in (see normalize_flavors) to avoid normalizing the lines again.
+    With jobs > 1 the flavor lines are split into chunks matched in worker processes.
+    With verbose, every match is printed along with the artist that caused it.
+    """
+    normalized_artists = normalize_artists(artists_lines)
+    if normalized_flavors is None:
+        normalized_flavors = normalize_flavors(flavors_lines)
+
+    if jobs > 1 and len(normalized_flavors) > 1:
+        chunk_size = -(-len(normalized_flavors) // jobs)
+        chunks = [(i, normalized_flavors[i:i + chunk_size]) for i in range(0, len(normalized_flavors), chunk_size)]
+        with Pool(jobs, initializer=_init_matcher, initargs=(normalized_artists, verbose)) as pool:
+            removals_idx = [idx for part in pool.map(_match_chunk, chunks) for idx in part]
+    else:
+        _init_matcher(normalized_artists, verbose)
+        removals_idx = _match_chunk((0, normalized_flavors))
+
+    removals_lines = [flavors_lines[idx] for idx in removals_idx]
     return removals_idx, removals_lines
 
 
+def write_lines(path: Path, lines: Iterable[str]) -> None:
+    # Stream line by line instead of joining everything into one big string
+    with path.open('w', encoding='utf-8') as f:
+        f.writelines(line + '\n' for line in lines)
+
+
 def write_filtered(flavors_lines: List[str], removals_idx: List[int], flavors_path: Path, create_backup=False) -> Path:
-    if create_backup:
-        stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-        backup_path = flavors_path.with_suffix(flavors_path.suffix + f".bak.{stamp}")
-        backup_path.write_text("\n".join(flavors_lines) + ("\n" if flavors_lines and not flavors_lines[-1].endswith("\n") else ""), encoding='utf-8')
-    else:
-        backup_path = None
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        backup_future = None
+        if create_backup:
+            stamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
+            backup_path = flavors_path.with_suffix(flavors_path.suffix + f".bak.{stamp}")
+            # Write the backup in the background while the filtered file is written
+            backup_future = executor.submit(write_lines, backup_path, flavors_lines)
+        else:
+            backup_path = None
 
-    # Build new lines without removals. Preserve original order and other lines.
-    kept_lines = [line for idx, line in enumerate(flavors_lines) if idx not in set(removals_idx)]
-    flavors_path.write_text("\n".join(kept_lines) + ("\n" if kept_lines and not kept_lines[-1].endswith("\n") else ""), encoding='utf-8')
+        # Build new lines without removals. Preserve original order and other lines.
+        removals_set = frozenset(removals_idx)
+        kept_lines = (line for idx, line in enumerate(flavors_lines) if idx not in removals_set)
+        # Write next to the original and swap it in, so a crash never leaves a truncated file
+        tmp_path = flavors_path.with_suffix(flavors_path.suffix + ".tmp")
+        write_lines(tmp_path, kept_lines)
+        if backup_future is not None:
+            backup_future.result()
+    os.replace(tmp_path, flavors_path)
     return backup_path
 
 
@@ -116,6 +219,8 @@ def main():
     p.add_argument("--flavors", type=Path, required=True, help="Path to flavors.txt")
     p.add_argument("--inplace", action="store_true", help="Write changes to flavors file (creates timestamped backup). Without this flag, runs a dry-run.")
     p.add_argument("--no-backup", action="store_true", help="If --inplace, do not create a backup (not recommended).")
+    p.add_argument("--verbose", action="store_true", help="Print every matched flavor line with the artist it matched.")
+    p.add_argument("--jobs", type=int, default=1, help="Number of worker processes used for matching (0 = one per CPU core).")
     args = p.parse_args()
 
     if not args.artists.exists():
@@ -126,7 +231,12 @@ def main():
     artists_lines = load_nonempty_lines(args.artists)
     flavors_lines = load_nonempty_lines(args.flavors)
 
-    removals_idx, removals_lines = find_removals(flavors_lines, artists_lines)
+    # Normalize once; the normalized lines are reused for all matching below
+    normalized_flavors = normalize_flavors(flavors_lines)
+
+    jobs = args.jobs or os.cpu_count() or 1
+    removals_idx, removals_lines = find_removals(flavors_lines, artists_lines, jobs=jobs, verbose=args.verbose,
+                                                 normalized_flavors=normalized_flavors)
 
     print(f"Total flavors lines: {len(flavors_lines)}")
     print(f"Matched (to remove): {len(removals_idx)}")
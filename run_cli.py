@@ -3,10 +3,13 @@ import argparse
 import csv
 import os
 import requests
+from concurrent.futures import ThreadPoolExecutor
 import torch
 from PIL import Image
 from clip_interrogator import Interrogator, Config, list_clip_models
 
+IMAGE_EXTENSIONS = frozenset({'jpg', 'jpeg', 'png', 'bmp', 'webp', 'gif'})
+
 def inference(ci, images, mode):
     if mode == 'best':
         return ci.interrogate(images)
@@ -94,8 +97,10 @@ def main():
             print(f'The folder {args.folder} does not exist!')
             exit(1)
 
-        files = [f for f in os.listdir(args.folder) if f.endswith('.jpg') or f.endswith('.png') or f.endswith('.jpeg') or f.endswith('.bmp') or f.endswith('.webp') or f.endswith('.gif')]
-        images = [Image.open(os.path.join(args.folder, file)).convert('RGB') for file in files]
+        files = [e.name for e in os.scandir(args.folder) if e.is_file() and e.name.rsplit('.', 1)[-1].lower() in IMAGE_EXTENSIONS]
+        # PIL releases the GIL while decoding, so images can be loaded in parallel
+        with ThreadPoolExecutor() as executor:
+            images = list(executor.map(lambda file: Image.open(os.path.join(args.folder, file)).convert('RGB'), files))
 
         if args.mode == 'best':
             gen = inference(ci, images, args.mode)